@@ -9,14 +9,131 @@ from qiskit.quantum_info import Operator
 import numpy as np
 from math import gcd
 from fractions import Fraction
+from functools import lru_cache
 import time
 
+@lru_cache(maxsize=16)
+def iqft_template(n):
+    """
+    n-qubit inverse QFT, built once per n and composed into circuits.
+    Callers must not modify the returned circuit.
+    """
+    qc = QuantumCircuit(n)
+    angles = -np.pi / 2.0 ** np.arange(1, n + 1)
+    
+    # Swap qubits
+    for i in range(n // 2):
+        qc.swap(i, n - i - 1)
+        
+    # Controlled phase gates
+    for j in range(n):
+        qc.h(j)
+        for k in range(j):
+            qc.cp(angles[j - k - 1], k, j)
+    
+    return qc
+
+def integer_root(n, k):
+    """Largest integer r with r^k <= n (exact Newton iteration)"""
+    if n < 2:
+        return n
+    x = 1 << -(-n.bit_length() // k)
+    while True:
+        y = ((k - 1) * x + n // x ** (k - 1)) // k
+        if y >= x:
+            return x
+        x = y
+
+def _carmichael_lambda(n):
+    """Carmichael function λ(n) from the prime factorization of n"""
+    lam = 1
+    for p, k in _factorize(n).items():
+        if p == 2 and k >= 3:
+            term = 2 ** (k - 2)
+        else:
+            term = (p - 1) * p ** (k - 1)
+        lam = lam * term // gcd(lam, term)
+    return lam
+
+def _factorize(n):
+    """Prime factorization of n as a {prime: exponent} dict"""
+    factors = {}
+    stack = [n]
+    while stack:
+        m = stack.pop()
+        if m == 1:
+            continue
+        if _miller_rabin(m):
+            factors[m] = factors.get(m, 0) + 1
+            continue
+        d = _pollard_rho(m)
+        stack.extend((d, m // d))
+    return factors
+
+def _miller_rabin(n):
+    """Miller-Rabin primality test (deterministic for n < 3.3e24)"""
+    if n < 2:
+        return False
+    bases = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+    for p in bases:
+        if n % p == 0:
+            return n == p
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    for b in bases:
+        x = pow(b, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+def _pollard_rho(n):
+    """Pollard-rho (Brent variant): a non-trivial divisor of composite n"""
+    if n % 2 == 0:
+        return 2
+    for p in (3, 5, 7, 11, 13):
+        if n % p == 0:
+            return p
+    c = 1
+    while True:
+        y, r, q, g = 2, 1, 1, 1
+        while g == 1:
+            x = y
+            for _ in range(r):
+                y = (y * y + c) % n
+            k = 0
+            while k < r and g == 1:
+                ys = y
+                for _ in range(min(128, r - k)):
+                    y = (y * y + c) % n
+                    q = q * abs(x - y) % n
+                g = gcd(q, n)
+                k += 128
+            r *= 2
+        if g == n:
+            g = 1
+            while g == 1:
+                ys = (ys * ys + c) % n
+                g = gcd(abs(x - ys), n)
+        if g != n:
+            return g
+        c += 1
+
 class ShorAlgorithm:
     """Qiskit implementation of Shor algorithm"""
     
     def __init__(self, N):
-        self.N = N
-        self.n_qubits = int(np.ceil(np.log2(N)))
+        self.N = int(N)
+        self.n_qubits = int(np.ceil(np.log2(self.N)))
+        self._period_cache = {}
+        self._lambda = None
         
     def quantum_period_finding(self, a, precision=None):
         """
@@ -30,8 +147,7 @@ class ShorAlgorithm:
         qc = QuantumCircuit(precision + self.n_qubits, precision)
         
         # Putting the first register into superposition
-        for i in range(precision):
-            qc.h(i)
+        qc.h(range(precision))
             
         # Prepare the second register to the |1⟩ state
         qc.x(precision)
@@ -45,9 +161,8 @@ class ShorAlgorithm:
         # Inverse QFT
         self._inverse_qft(qc, precision)
         
-        # Ölçüm
-        for i in range(precision):
-            qc.measure(i, i)
+        # Measurement
+        qc.measure(range(precision), range(precision))
             
         return qc
     
@@ -55,46 +170,44 @@ class ShorAlgorithm:
         """Controlled U^(2^j) gate - simplified version"""
         # Because the actual implementation is complex
         # Approximate simulation with phase gate
-        angle = 2 * np.pi * (a ** power % self.N) / self.N
+        angle = 2 * np.pi * pow(a, power, self.N) / self.N
         if self.n_qubits + len(qc.qubits) > control + 1:
             target = len(qc.qubits) - self.n_qubits
             if target > control:
                 qc.cp(angle, control, target)
     
     def _inverse_qft(self, qc, n):
-        """n-qubitlik inverse Quantum Fourier Transform"""
-        # Swap qubits
-        for i in range(n // 2):
-            qc.swap(i, n - i - 1)
-            
-        # Controlled phase gates
-        for j in range(n):
-            qc.h(j)
-            for k in range(j):
-                qc.cp(-np.pi / (2 ** (j - k)), k, j)
+        """n-qubit inverse Quantum Fourier Transform"""
+        qc.compose(iqft_template(n), qubits=range(n), inplace=True)
     
     def find_factors(self, max_attempts=10):
-        """Shor algoritması ile N'yi çarpanlarına ayır"""
+        """Factor N using Shor's algorithm"""
         print(f"\nFactoring {self.N} with Shor Algorithm")
         print("=" * 50)
         
         if self.N % 2 == 0:
             return 2, self.N // 2
+        
+        # A prime N has no non-trivial factors
+        if _miller_rabin(self.N):
+            print(f"  ✗ {self.N} is prime")
+            return None, None
             
         # Is it of the form N = a^b?
-        for b in range(2, int(np.log2(self.N)) + 1):
-            a = int(self.N ** (1/b))
+        for b in range(2, self.N.bit_length() + 1):
+            a = integer_root(self.N, b)
             if a ** b == self.N:
                 return a, self.N // a
         
+        candidates = np.random.randint(2, self.N, size=max_attempts)
         for attempt in range(max_attempts):
             print(f"\nAttempt {attempt + 1}:")
             
-            # Rastgele a seç
-            a = np.random.randint(2, self.N)
+            # Pick a random a
+            a = int(candidates[attempt])
             g = gcd(a, self.N)
             
-            print(f"  Seçilen a = {a}")
+            print(f"  Selected a = {a}")
             print(f"  gcd({a}, {self.N}) = {g}")
             
             if g > 1:
@@ -103,7 +216,7 @@ class ShorAlgorithm:
             
             # Quantum period finding (simulation)
             print(f"  Starting quantum period detection...")
-            r = self._classical_period_finding(a)  
+            r, x = self._classical_period_finding(a)  
             
             if r is None:
                 print(f"  ✗ Period not found")
@@ -115,7 +228,6 @@ class ShorAlgorithm:
                 print(f"  ✗ Period odd number")
                 continue
                 
-            x = pow(a, r // 2, self.N)
             factor1 = gcd(x - 1, self.N)
             factor2 = gcd(x + 1, self.N)
             
@@ -129,11 +241,39 @@ class ShorAlgorithm:
         return None, None
     
     def _classical_period_finding(self, a):
-        """Classical period finding (for simulation)"""
-        for r in range(1, self.N):
-            if pow(a, r, self.N) == 1:
-                return r
-        return None
+        """
+        Classical period finding (for simulation).
+        The order of a divides Carmichael's λ(N), so instead of scanning
+        every r we start from λ(N) and divide out its prime factors.
+        Returns (r, a^(r/2) mod N); the second value is None for odd r.
+        """
+        if a in self._period_cache:
+            return self._period_cache[a]
+        
+        if gcd(a, self.N) != 1:
+            return None, None
+        
+        # NOTE: this stand-in factors N classically to get λ(N), so the
+        # demo's factors do not come from the period search alone.
+        # λ(N) and its primes are fixed per N, so compute them once.
+        if self._lambda is None:
+            lam = _carmichael_lambda(self.N)
+            # Reduce by 2 last: the test that stops it is a^(r/2) for the final r
+            self._lambda = lam, sorted(_factorize(lam), key=lambda p: p == 2)
+        
+        r, primes = self._lambda
+        half_pow = None
+        for p in primes:
+            while r % p == 0:
+                y = pow(a, r // p, self.N)
+                if y != 1:
+                    if p == 2:
+                        half_pow = y
+                    break
+                r //= p
+        
+        self._period_cache[a] = r, half_pow
+        return r, half_pow
 
 def demonstrate_rsa_breaking():
     """RSA-like encryption cracking demonstration"""
@@ -176,7 +316,7 @@ def demonstrate_rsa_breaking():
             print(f"\n❌ Could not be factored")
             results.append((N, None, None, False))
     
-    # Özet
+    # Summary
     print(f"\n{'='*60}")
     print("SUMMARY RESULTS:")
     print(f"{'='*60}")
@@ -4,11 +4,61 @@ This script demonstrates the basic components of the Shor algorithm using Qiskit
 """
 
 from qiskit import QuantumCircuit, transpile
-from qiskit.primitives import Sampler
-from qiskit_aer import AerSimulator
+from qiskit_aer import AerSimulator, AerError
 import numpy as np
 from math import gcd
 from fractions import Fraction
+from functools import lru_cache
+from shor_algorithm import integer_root, iqft_template
+
+# Importing Numba and loading the compiled kernel costs more than the whole
+# Python orbit walk for small N, so the native kernel is only used from
+# _NATIVE_MIN_N. It works on int64; with a and x reduced mod N, x * a stays
+# below 2**62 under _NATIVE_MAX_N.
+_NATIVE_MIN_N = 1 << 22
+_NATIVE_MAX_N = 1 << 31
+
+# QPE circuits here are narrow and weakly entangled, so a matrix product
+# state avoids allocating the full 2^n state vector. The bond dimension is
+# left uncapped so wide circuits on the CPU fallback are never truncated.
+_SIMULATOR_OPTIONS = {"method": "matrix_product_state"}
+
+# Below this width GPU launch and transfer overhead outweighs the speedup
+_GPU_MIN_QUBITS = 14
+_GPU_SIMULATOR_OPTIONS = {
+    "method": "statevector",
+    "device": "GPU",
+    "cuStateVec_enable": True,
+}
+
+# Shared across calls so Aer's thread pool is set up once.
+# _GPU_SIM is None until probed and False once the probe finds no GPU.
+_SIM = AerSimulator(**_SIMULATOR_OPTIONS)
+_GPU_SIM = None
+
+def _probe_gpu_simulator():
+    """GPU state-vector simulator, or False if Aer cannot use a GPU"""
+    if "GPU" not in _SIM.available_devices():
+        return False
+    try:
+        return AerSimulator(**_GPU_SIMULATOR_OPTIONS)
+    except AerError as err:
+        print(f"GPU simulator unavailable, using CPU: {err}")
+        return False
+
+def _get_simulator(num_qubits):
+    """
+    Shared Aer simulator for a circuit with num_qubits qubits.
+    Wide circuits run on the GPU via cuStateVec when CUDA is available;
+    the GPU is probed once, on first use.
+    """
+    global _GPU_SIM
+    if num_qubits >= _GPU_MIN_QUBITS:
+        if _GPU_SIM is None:
+            _GPU_SIM = _probe_gpu_simulator()
+        if _GPU_SIM is not False:
+            return _GPU_SIM
+    return _SIM
 
 def quantum_phase_estimation(a, N, precision=3):
     """
@@ -20,43 +70,72 @@ def quantum_phase_estimation(a, N, precision=3):
     
     qc = QuantumCircuit(n_count + n_aux, n_count)
     
-    for i in range(n_count):
-        qc.h(i)
+    qc.h(range(n_count))
     
     qc.x(n_count)
     
     for counting_qubit in range(n_count):
-        angle = 2 * np.pi * (a ** (2 ** counting_qubit)) / N
+        # Reducing mod N only drops whole turns of 2π from the phase
+        angle = 2 * np.pi * pow(a, 1 << counting_qubit, N) / N
         qc.cp(angle, counting_qubit, n_count)
     
-    for i in range(n_count // 2):
-        qc.swap(i, n_count - i - 1)
-    
-    for j in range(n_count):
-        qc.h(j)
-        for k in range(j):
-            qc.cp(-np.pi / (2 ** (j - k)), k, j)
+    qc.compose(iqft_template(n_count), qubits=range(n_count), inplace=True)
     
-    for i in range(n_count):
-        qc.measure(i, i)
+    qc.measure(range(n_count), range(n_count))
     
     return qc
 
+@lru_cache(maxsize=32)
+def _cached_transpile(a, N, precision):
+    """
+    QPE circuit for (a, N, precision) and its transpiled form.
+    The circuit shape is fixed by the key, so transpiler passes run once.
+    Callers must not modify the returned circuits.
+    """
+    qc = quantum_phase_estimation(a, N, precision=precision)
+    transpiled = transpile(qc, _get_simulator(qc.num_qubits), optimization_level=3)
+    return qc, transpiled
+
 def find_period(a, N, shots=1024):
     """
     Find the period using classical simulation.
     In a real quantum computer this is done with QPE.
     """
+    if _NATIVE_MIN_N <= N < _NATIVE_MAX_N:
+        kernel = _native_period_find()
+    else:
+        kernel = _period_find
+    r = kernel(int(a), int(N))
+    return r if r != -1 else None
+
+def _period_find(a, N):
+    """
+    Smallest r with a^r mod N = 1, or -1 if there is none.
+    Walks the orbit with one multiplication per step.
+    """
+    a %= N
+    x = a
     for r in range(1, N):
-        if pow(a, r, N) == 1:
+        if x == 1:
             return r
-    return None
+        x = (x * a) % N
+    return -1
+
+@lru_cache(maxsize=1)
+def _native_period_find():
+    """Numba build of _period_find, compiled on first use"""
+    try:
+        from numba import njit
+    except ImportError:  # Numba is optional; fall back to plain Python
+        return _period_find
+    return njit(cache=True)(_period_find)
 
 def shors_algorithm(N):
     """
     A simplified version of Shor's algorithm. 
     Factors the number N.
     """
+    N = int(N)
     print(f"\n{'='*50}")
     print(f"Factoring {N} numbers using Shor's Algorithm")
     print(f"{'='*50}\n")
@@ -64,13 +143,14 @@ def shors_algorithm(N):
     if N % 2 == 0:
         return 2, N // 2
     
-    for b in range(2, int(np.log2(N)) + 1):
-        a = int(N ** (1 / b))
+    for b in range(2, N.bit_length() + 1):
+        a = integer_root(N, b)
         if a ** b == N:
-            return a, b
+            return a, N // a
     
+    candidates = np.random.randint(2, N, size=5)
     for attempt in range(5):  
-        a = np.random.randint(2, N)
+        a = int(candidates[attempt])
         g = gcd(a, N)
         
         print(f"Attempt {attempt + 1}: a = {a}")
@@ -87,14 +167,15 @@ def shors_algorithm(N):
             print("No period found.")
             continue
             
-        print(f"Periyot r = {r}")
+        print(f"Period r = {r}")
         
         if r % 2 != 0:
             print("Period is odd, new a will be tried.")
             continue
         
-        factor1 = gcd(a ** (r // 2) - 1, N)
-        factor2 = gcd(a ** (r // 2) + 1, N)
+        x = pow(a, r // 2, N)
+        factor1 = gcd(x - 1, N)
+        factor2 = gcd(x + 1, N)
         
         if factor1 > 1 and factor1 < N:
             print(f"\nMultipliers found!")
@@ -113,7 +194,8 @@ def demonstrate_quantum_circuit():
     print("\nQuantum Circuit Demonstration")
     print("-" * 30)
     
-    qc = quantum_phase_estimation(2, 15, precision=4)
+    a, N, precision = 2, 15, 4
+    qc, transpiled = _cached_transpile(a, N, precision)
     
     print("Quantum circuit created.")
     print(f"Total number of qubits: {qc.num_qubits}")
@@ -122,11 +204,14 @@ def demonstrate_quantum_circuit():
     print("\nCircuit Structure:")
     print(qc.draw(output='text', fold=80))
     
-    simulator = AerSimulator()
-    transpiled = transpile(qc, simulator)
-    sampler = Sampler()
+    simulator = _get_simulator(qc.num_qubits)
     
     print("\nStarting simulation...")
+    counts = simulator.run(transpiled, shots=1024).result().get_counts()
+    
+    print("Measured counting-register states (shots = 1024):")
+    for state, count in sorted(counts.items(), key=lambda item: -item[1]):
+        print(f"  |{state}⟩: {count}")
 
 def main():
     numbers_to_factor = [15, 21, 35]
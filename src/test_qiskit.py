@@ -12,7 +12,7 @@ circuit.measure([0,1], [0,1])
 
 simulator = AerSimulator()
 
-compiled_circuit = transpile(circuit, simulator)
+compiled_circuit = transpile(circuit, simulator, optimization_level=3)
 
 job = simulator.run(compiled_circuit, shots=1000)
 